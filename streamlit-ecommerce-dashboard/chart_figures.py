@@ -0,0 +1,96 @@
+import plotly.graph_objects as go
+import plotly.io as pio
+import streamlit as st
+
+# --- Configuration --- #
+FIGURE_CACHE_SIZE = 128
+
+# --- Figure Template --- #
+# Built and validated once at import. Trace defaults live in the template so each
+# figure only carries its data, instead of going through Plotly Express on every rerun.
+# It extends the default template, which importing streamlit sets to "streamlit", so the
+# figures pick up the app's theme colours like the Plotly Express ones did.
+def _build_template():
+    template = go.layout.Template(pio.templates[pio.templates.default])
+    template.layout.update(
+        margin=dict(t=60),
+        legend=dict(tracegroupgap=0),
+    )
+    template.data.scatter = [go.Scatter(mode="lines+markers")]
+    template.data.pie = [go.Pie(sort=False)]
+    template.data.treemap = [go.Treemap(branchvalues="total")]
+    return template
+
+DASHBOARD_TEMPLATE = _build_template()
+
+def _layout(title, x_title=None, y_title=None, **layout):
+    return go.Layout(
+        template=DASHBOARD_TEMPLATE,
+        title=dict(text=title),
+        xaxis=dict(title=dict(text=x_title)) if x_title is not None else None,
+        yaxis=dict(title=dict(text=y_title)) if y_title is not None else None,
+        **layout
+    )
+
+# --- Cached Figure Builders --- #
+# st.cache_resource keys each figure on a hash of its input DataFrame and layout
+# arguments, so a chart whose data hasn't changed is reused as-is on rerun.
+# st.plotly_chart only reads the figure, so sharing it between sessions is safe.
+@st.cache_resource(max_entries=FIGURE_CACHE_SIZE, show_spinner=False)
+def line_figure(df, x, y, title, x_title=None, y_title=None, hovermode=None):
+    return go.Figure(
+        data=[go.Scatter(x=df[x], y=df[y], hovertemplate=f"{x}=%{{x}}<br>{y}=%{{y}}<extra></extra>")],
+        layout=_layout(title, x_title or x, y_title or y, hovermode=hovermode),
+    )
+
+@st.cache_resource(max_entries=FIGURE_CACHE_SIZE, show_spinner=False)
+def pie_figure(df, values, names, title, textposition=None, textinfo=None):
+    return go.Figure(
+        data=[go.Pie(
+            labels=df[names],
+            values=df[values],
+            textposition=textposition,
+            textinfo=textinfo,
+            hovertemplate=f"{names}=%{{label}}<br>{values}=%{{value}}<extra></extra>",
+        )],
+        layout=_layout(title),
+    )
+
+@st.cache_resource(max_entries=FIGURE_CACHE_SIZE, show_spinner=False)
+def bar_figure(df, x, y, title, colorscale=None, x_title=None, y_title=None):
+    marker = None
+    if colorscale is not None:
+        # Same as px.bar(color=y): bars shaded by their own value with a colour bar
+        marker = dict(color=df[y], colorscale=colorscale, showscale=True, colorbar=dict(title=dict(text=y)))
+    return go.Figure(
+        data=[go.Bar(x=df[x], y=df[y], marker=marker, hovertemplate=f"{x}=%{{x}}<br>{y}=%{{y}}<extra></extra>")],
+        layout=_layout(title, x_title or x, y_title or y),
+    )
+
+@st.cache_resource(max_entries=FIGURE_CACHE_SIZE, show_spinner=False)
+def category_bar_figure(df, x, y, title, color_map):
+    # One trace per category, so each category gets its own colour and legend entry
+    traces = [
+        go.Bar(
+            x=[category],
+            y=[value],
+            name=str(category),
+            marker=dict(color=color_map.get(category)),
+            hovertemplate=f"{x}=%{{x}}<br>{y}=%{{y}}<extra></extra>",
+        )
+        for category, value in zip(df[x], df[y])
+    ]
+    return go.Figure(data=traces, layout=_layout(title, x, y, legend=dict(title=dict(text=x))))
+
+@st.cache_resource(max_entries=FIGURE_CACHE_SIZE, show_spinner=False)
+def treemap_figure(df, path, values, title):
+    return go.Figure(
+        data=[go.Treemap(
+            ids=df[path],
+            labels=df[path],
+            parents=[""] * len(df),
+            values=df[values],
+            hovertemplate=f"{path}=%{{label}}<br>{values}=%{{value}}<extra></extra>",
+        )],
+        layout=_layout(title),
+    )
@@ -2,6 +2,7 @@
 import pandas as pd
 import random
 from datetime import datetime, timedelta
+from transaction_store import add_time_buckets, preprocess_transactions, write_transactions_dataset
 
 def generate_customers_data(num_customers=100):
     customer_data = []
@@ -57,11 +58,26 @@ def generate_inventory_data(num_inventory=200):
         inventory_data.append([inventory_id, vendor_id, name_inventory, brand, item_type, model, price, estimated_price, incoming_date, date_sold, availability, status, picture])
     return pd.DataFrame(inventory_data, columns=["inventoryID", "vendorID", "nameInventory", "Brand", "type", "modal", "Price", "EstimatedPrice", "incomingDate", "dateSold", "availability", "status", "picture"])
 
-def generate_transactions_data(num_transactions=500, customer_ids=None, inventory_ids=None):
+def generate_transaction_timestamps(num_transactions, num_days=365, end_date=None):
+    # Volume varies by day: it grows over the period and peaks at the weekend
+    end_date = end_date or datetime.now()
+    # Whole calendar days, so the weekday weights line up with real weekdays whatever the time of day
+    start_date = end_date.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=num_days)
+    days = [start_date + timedelta(days=d) for d in range(num_days)]
+    weekday_weights = [1.0, 0.9, 0.9, 1.0, 1.2, 1.5, 1.3]
+    weights = [(0.5 + d / num_days) * weekday_weights[day.weekday()] for d, day in enumerate(days)]
+    timestamps = [
+        (day + timedelta(seconds=random.randint(0, 86399))).replace(microsecond=0)
+        for day in random.choices(days, weights=weights, k=num_transactions)
+    ]
+    return sorted(timestamps)
+
+def generate_transactions_data(num_transactions=500, customer_ids=None, inventory_ids=None, num_days=365):
     transaction_data = []
     channels = ["Website", "Mobile App", "Retail Store", "Marketplace"]
     sold_by_options = ["Salesperson A", "Salesperson B", "Online System"]
-    for i in range(1, num_transactions + 1):
+    timestamps = generate_transaction_timestamps(num_transactions, num_days=num_days)
+    for i, transaction_date in enumerate(timestamps, start=1):
         transaction_id = f"TRN{i:05d}"
         customer_id = random.choice(customer_ids) if customer_ids else f"CUST{random.randint(1,100):04d}"
         inventory_id = random.choice(inventory_ids) if inventory_ids else f"INV{random.randint(1,200):04d}"
@@ -74,8 +90,11 @@ def generate_transactions_data(num_transactions=500, customer_ids=None, inventor
         sold_by = random.choice(sold_by_options)
         no_invoice = f"INV{random.randint(100000,999999):06d}"
         notes = random.choice(channels)
-        transaction_data.append([transaction_id, customer_id, inventory_id, total_sales, total_earnings, shipping_fee, other_fee, ket_fee, shipping_id, sold_by, no_invoice, notes])
-    return pd.DataFrame(transaction_data, columns=["transactionID", "customerID", "inventoryID", "totalSales", "totalEarings", "shippingFee", "otherFee", "ketFee", "shippingID", "soldBy", "noInvoice", "notes"])
+        transaction_data.append([transaction_id, customer_id, inventory_id, total_sales, total_earnings, shipping_fee, other_fee, ket_fee, shipping_id, sold_by, no_invoice, notes, transaction_date])
+    df = pd.DataFrame(transaction_data, columns=["transactionID", "customerID", "inventoryID", "totalSales", "totalEarings", "shippingFee", "otherFee", "ketFee", "shippingID", "soldBy", "noInvoice", "notes", "transactionDate"])
+    df["transactionDate"] = pd.to_datetime(df["transactionDate"])
+    # Precomputed day/week/month/day-of-week bucket codes, see transaction_store.add_time_buckets
+    return add_time_buckets(df)
 
 def generate_shipping_data(num_shipping=500, customer_ids=None):
     shipping_data = []
@@ -101,6 +120,7 @@ if __name__ == "__main__":
     os.makedirs(output_dir, exist_ok=True)
 
     excel_file_path = os.path.join(output_dir, "ecommerce_data.xlsx")
+    transactions_dataset_dir = os.path.join(output_dir, "transactions")
 
     print("Generating dummy data...")
 
@@ -122,6 +142,10 @@ if __name__ == "__main__":
         df_transactions.to_excel(writer, sheet_name='transaction', index=False)
         df_shipping.to_excel(writer, sheet_name='shipping', index=False)
 
+    # Month-partitioned copy of the transactions used by the dashboards' chunked mode
+    write_transactions_dataset(preprocess_transactions(df_transactions.copy()), transactions_dataset_dir, overwrite=True)
+
     print(f"All dummy data generated successfully in {excel_file_path}")
+    print(f"Partitioned transactions written to {transactions_dataset_dir}")
 
 
@@ -1,10 +1,31 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import os
+import glob
+import time
+import tempfile
 from datetime import datetime, timedelta
+from transaction_store import (
+    preprocess_transactions,
+    filter_transactions,
+    aggregate_transactions,
+    aggregate_transactions_chunked,
+    list_channels,
+    iter_filtered_chunks,
+    write_filtered_csv,
+    has_dataset,
+    dataset_version,
+)
+from inventory_index import InventoryIndex
+from chart_figures import (
+    line_figure,
+    pie_figure,
+    bar_figure,
+    category_bar_figure,
+    treemap_figure,
+)
 
 # --- Configuration --- #
 st.set_page_config(
@@ -30,8 +51,7 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- Helper Functions to Load Data --- #
-@st.cache_data
-def load_data_from_excel(file_path, sheet_name):
+def read_excel_sheet(file_path, sheet_name):
     try:
         df = pd.read_excel(file_path, sheet_name=sheet_name)
         return df
@@ -42,30 +62,58 @@ def load_data_from_excel(file_path, sheet_name):
         st.error(f"Error loading data from sheet '{sheet_name}': {e}")
         return pd.DataFrame()
 
+@st.cache_data
+def load_data_from_excel(file_path, sheet_name):
+    return read_excel_sheet(file_path, sheet_name)
+
+@st.cache_resource
+def load_inventory_index(file_path):
+    # Built once per file and shared by all sessions. The inventory views and the export both
+    # read from it, so the sheet is read uncached here and no DataFrame copy is kept per rerun.
+    df = read_excel_sheet(file_path, "inventory")
+    if not df.empty:
+        df["Price"] = pd.to_numeric(df["Price"], errors='coerce').fillna(0)
+        df["incomingDate"] = pd.to_datetime(df["incomingDate"], errors='coerce')
+    return InventoryIndex.from_dataframe(df)
+
+def remove_old_exports(directory, max_age_hours):
+    # Exports too large to download stay on the server for copying; they are removed after a while
+    cutoff = time.time() - max_age_hours * 3600
+    for path in glob.glob(os.path.join(directory, "sales_data_*.csv")):
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except FileNotFoundError:
+            pass  # Removed by another session's sweep
+
+@st.cache_data(max_entries=256, ttl=3600)
+def load_sales_aggregates_chunked(dataset_dir, df_customers, start_date, end_date, channel, city, state, version):
+    # version (see dataset_version) is only part of the cache key, so newly ingested parts aren't served stale
+    return aggregate_transactions_chunked(dataset_dir, df_customers, start_date, end_date, channel, city, state)
+
 # --- Load All DataFrames from a single Excel file --- #
 dummy_data_dir = "./dummy_data"
 excel_file = os.path.join(dummy_data_dir, "ecommerce_data.xlsx")
+# Transaction history too large for memory is read chunk by chunk from a month-partitioned
+# Parquet dataset (see transaction_store.py); only partitions inside the selected window are opened.
+# The Excel sheet is only loaded when no dataset exists.
+transactions_dataset_dir = os.path.join(dummy_data_dir, "transactions")
+# Chunked-mode sales exports are written here; files up to the limit are also offered as a download
+exports_dir = "./exports"
+EXPORT_DOWNLOAD_LIMIT_MB = 50
+EXPORT_RETENTION_HOURS = 24
+chunked_mode = has_dataset(transactions_dataset_dir)
 
 df_customers = load_data_from_excel(excel_file, "customers")
 df_vendors = load_data_from_excel(excel_file, "vendors")
-df_inventory = load_data_from_excel(excel_file, "inventory")
-df_transactions = load_data_from_excel(excel_file, "transaction")
+df_transactions = pd.DataFrame() if chunked_mode else load_data_from_excel(excel_file, "transaction")
 df_shipping = load_data_from_excel(excel_file, "shipping")
 
 # --- Data Preprocessing --- #
 if not df_transactions.empty:
-    df_transactions["totalSales"] = pd.to_numeric(df_transactions["totalSales"], errors='coerce').fillna(0)
-    df_transactions["totalEarings"] = pd.to_numeric(df_transactions["totalEarings"], errors='coerce').fillna(0)
-    # Create a more realistic transaction date based on row index
-    df_transactions["transactionDate"] = pd.date_range(start='2024-01-01', periods=len(df_transactions), freq='D')
-    
-    # Add more columns for better interactivity
-    df_transactions["month"] = df_transactions["transactionDate"].dt.strftime('%Y-%m')
-    df_transactions["day_of_week"] = df_transactions["transactionDate"].dt.day_name()
+    df_transactions = preprocess_transactions(df_transactions)
 
-if not df_inventory.empty:
-    df_inventory["Price"] = pd.to_numeric(df_inventory["Price"], errors='coerce').fillna(0)
-    df_inventory["incomingDate"] = pd.to_datetime(df_inventory["incomingDate"], errors='coerce')
+inventory_index = load_inventory_index(excel_file)
 
 # Merge data for better analysis
 if not df_transactions.empty and not df_customers.empty:
@@ -96,8 +144,26 @@ else:  # Custom Range
     start_date = st.sidebar.date_input("Start Date", datetime.now() - timedelta(days=90))
     end_date = st.sidebar.date_input("End Date", datetime.now())
 
+# Filters work on whole days. Plain dates (rather than datetime.now()) also keep the
+# cached aggregates below keyed per day, so reruns on the same day hit the cache.
+start_date = pd.Timestamp(start_date).date()
+end_date = pd.Timestamp(end_date).date()
+
 # Additional Interactive Filters
-if not df_sales_analysis.empty:
+if chunked_mode:
+    # Channel Filter
+    # Channels come from the partition directory names, no data files are opened
+    channels = ['All'] + list_channels(transactions_dataset_dir)
+    selected_channel = st.sidebar.selectbox("📱 Sales Channel:", channels)
+    
+    # City Filter
+    cities = ['All'] + (list(df_customers['city'].dropna().unique()) if not df_customers.empty else [])
+    selected_city = st.sidebar.selectbox("🏙️ City:", cities)
+    
+    # State Filter
+    states = ['All'] + (list(df_customers['state'].dropna().unique()) if not df_customers.empty else [])
+    selected_state = st.sidebar.selectbox("🗺️ State:", states)
+elif not df_sales_analysis.empty:
     # Channel Filter
     channels = ['All'] + list(df_sales_analysis['notes'].unique())
     selected_channel = st.sidebar.selectbox("📱 Sales Channel:", channels)
@@ -111,39 +177,30 @@ if not df_sales_analysis.empty:
     selected_state = st.sidebar.selectbox("🗺️ State:", states)
 
 # Inventory Filter
-if not df_inventory.empty:
-    brands = ['All'] + list(df_inventory['Brand'].unique())
+if len(inventory_index) > 0:
+    brands = ['All'] + inventory_index.brands()
     selected_brand = st.sidebar.selectbox("🏷️ Brand:", brands)
+    brand_filter = None if selected_brand == 'All' else selected_brand
 
 # --- Apply Filters --- #
-if not df_sales_analysis.empty:
-    # Date filter
-    filtered_data = df_sales_analysis[
-        (df_sales_analysis["transactionDate"] >= pd.to_datetime(start_date))
-        & (df_sales_analysis["transactionDate"] <= pd.to_datetime(end_date))
-    ]
-    
-    # Channel filter
-    if selected_channel != 'All':
-        filtered_data = filtered_data[filtered_data['notes'] == selected_channel]
-    
-    # City filter
-    if selected_city != 'All':
-        filtered_data = filtered_data[filtered_data['city'] == selected_city]
-    
-    # State filter
-    if selected_state != 'All':
-        filtered_data = filtered_data[filtered_data['state'] == selected_state]
-else:
+if chunked_mode:
+    # Only the merged partial aggregates are kept in memory, never the filtered rows
     filtered_data = pd.DataFrame()
-
-# Filter inventory
-if not df_inventory.empty:
-    filtered_inventory = df_inventory.copy()
-    if selected_brand != 'All':
-        filtered_inventory = filtered_inventory[filtered_inventory['Brand'] == selected_brand]
+    sales = load_sales_aggregates_chunked(
+        transactions_dataset_dir, df_customers, start_date, end_date,
+        selected_channel, selected_city, selected_state,
+        dataset_version(transactions_dataset_dir, start_date, end_date, selected_channel)
+    )
+elif not df_sales_analysis.empty:
+    # Date, channel, city and state filters
+    filtered_data = filter_transactions(
+        df_sales_analysis, start_date, end_date,
+        selected_channel, selected_city, selected_state
+    )
+    sales = aggregate_transactions(filtered_data)
 else:
-    filtered_inventory = pd.DataFrame()
+    filtered_data = pd.DataFrame()
+    sales = aggregate_transactions(filtered_data)
 
 # --- Dashboard Title --- #
 st.title("📊 Interactive E-commerce Executive Dashboard")
@@ -171,15 +228,15 @@ st.header("📈 Key Performance Indicators")
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
-    total_sales = filtered_data["totalSales"].sum() if not filtered_data.empty else 0
+    total_sales = sales["total_sales"]
     st.metric(
         label="💰 Total Sales", 
         value=f"${total_sales:,.2f}",
-        delta=f"{len(filtered_data)} transactions"
+        delta=f"{sales['num_transactions']} transactions"
     )
 
 with col2:
-    total_earnings = filtered_data["totalEarings"].sum() if not filtered_data.empty else 0
+    total_earnings = sales["total_earnings"]
     profit_margin = (total_earnings / total_sales * 100) if total_sales > 0 else 0
     st.metric(
         label="💵 Total Earnings", 
@@ -188,8 +245,8 @@ with col2:
     )
 
 with col3:
-    unique_customers = filtered_data["customerID"].nunique() if not filtered_data.empty else 0
-    avg_order_value = total_sales / len(filtered_data) if not filtered_data.empty else 0
+    unique_customers = sales["unique_customers"]
+    avg_order_value = total_sales / sales["num_transactions"] if sales["num_transactions"] > 0 else 0
     st.metric(
         label="👥 Active Customers", 
         value=unique_customers,
@@ -207,7 +264,7 @@ with col4:
     )
 
 # --- Interactive Charts Section --- #
-if not filtered_data.empty:
+if sales["num_transactions"] > 0:
     
     # Row 1: Sales Performance Charts
     st.header("📊 Interactive Sales Analytics")
@@ -216,35 +273,31 @@ if not filtered_data.empty:
     
     with col1:
         st.subheader("💹 Sales Trend Over Time")
-        daily_sales = filtered_data.groupby(filtered_data["transactionDate"].dt.date)["totalSales"].sum().reset_index()
-        daily_sales.columns = ['Date', 'Sales']
+        daily_sales = sales["daily_sales"]
         
-        fig_trend = px.line(
+        fig_trend = line_figure(
             daily_sales, 
             x='Date', 
             y='Sales',
             title="Daily Sales Performance",
-            markers=True
-        )
-        fig_trend.update_layout(
-            xaxis_title="Date",
-            yaxis_title="Sales ($)",
+            x_title="Date",
+            y_title="Sales ($)",
             hovermode='x unified'
         )
         st.plotly_chart(fig_trend, use_container_width=True)
     
     with col2:
         st.subheader("📱 Sales by Channel")
-        channel_sales = filtered_data.groupby("notes")["totalSales"].sum().reset_index()
-        channel_sales.columns = ['Channel', 'Sales']
+        channel_sales = sales["channel_sales"]
         
-        fig_channel = px.pie(
+        fig_channel = pie_figure(
             channel_sales,
             values='Sales',
             names='Channel',
-            title="Revenue Distribution by Channel"
+            title="Revenue Distribution by Channel",
+            textposition='inside',
+            textinfo='percent+label'
         )
-        fig_channel.update_traces(textposition='inside', textinfo='percent+label')
         st.plotly_chart(fig_channel, use_container_width=True)
     
     # Row 2: Geographic and Customer Analysis
@@ -252,60 +305,51 @@ if not filtered_data.empty:
     
     with col1:
         st.subheader("🗺️ Sales by Geography")
-        geo_sales = filtered_data.groupby("state")["totalSales"].sum().reset_index()
-        geo_sales.columns = ['State', 'Sales']
-        geo_sales = geo_sales.sort_values('Sales', ascending=False)
+        geo_sales = sales["geo_sales"]
         
-        fig_geo = px.bar(
+        fig_geo = bar_figure(
             geo_sales,
             x='State',
             y='Sales',
             title="Sales Performance by State",
-            color='Sales',
-            color_continuous_scale='Blues'
+            colorscale='Blues',
+            x_title="State",
+            y_title="Sales ($)"
         )
-        fig_geo.update_layout(xaxis_title="State", yaxis_title="Sales ($)")
         st.plotly_chart(fig_geo, use_container_width=True)
     
     with col2:
         st.subheader("📅 Sales by Day of Week")
-        dow_sales = filtered_data.groupby("day_of_week")["totalSales"].sum().reset_index()
-        dow_sales.columns = ['Day', 'Sales']
+        # Days are already ordered Monday to Sunday
+        dow_sales = sales["dow_sales"]
         
-        # Order days properly
-        day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        dow_sales['Day'] = pd.Categorical(dow_sales['Day'], categories=day_order, ordered=True)
-        dow_sales = dow_sales.sort_values('Day')
-        
-        fig_dow = px.bar(
+        fig_dow = bar_figure(
             dow_sales,
             x='Day',
             y='Sales',
             title="Sales Pattern by Day of Week",
-            color='Sales',
-            color_continuous_scale='Greens'
+            colorscale='Greens'
         )
         st.plotly_chart(fig_dow, use_container_width=True)
 
 # --- Interactive Inventory Management --- #
 st.header("📦 Interactive Inventory Management")
 
-if not filtered_inventory.empty:
+if len(inventory_index) > 0 and inventory_index.count(brand=brand_filter) > 0:
     col1, col2 = st.columns(2)
     
     with col1:
         # Inventory Status Distribution
         st.subheader("📊 Inventory Status Overview")
-        status_counts = filtered_inventory['availability'].value_counts().reset_index()
+        status_counts = inventory_index.count_by('availability', brand=brand_filter).reset_index()
         status_counts.columns = ['Status', 'Count']
         
-        fig_status = px.bar(
+        fig_status = category_bar_figure(
             status_counts,
             x='Status',
             y='Count',
             title="Items by Availability Status",
-            color='Status',
-            color_discrete_map={
+            color_map={
                 'In Stock': '#2E8B57',
                 'Low Stock': '#FF8C00',
                 'Out of Stock': '#DC143C'
@@ -314,24 +358,25 @@ if not filtered_inventory.empty:
         st.plotly_chart(fig_status, use_container_width=True)
         
         # Show critical items
-        critical_items = filtered_inventory[filtered_inventory['availability'].isin(['Low Stock', 'Out of Stock'])]
-        if not critical_items.empty:
-            st.warning(f"⚠️ {len(critical_items)} items need attention!")
+        critical_statuses = ['Low Stock', 'Out of Stock']
+        num_critical_items = inventory_index.count(brand=brand_filter, availability=critical_statuses)
+        if num_critical_items > 0:
+            st.warning(f"⚠️ {num_critical_items} items need attention!")
+            critical_items = inventory_index.items(brand=brand_filter, availability=critical_statuses, limit=10)
             st.dataframe(
-                critical_items[['nameInventory', 'Brand', 'availability', 'Price']].head(10),
+                critical_items[['nameInventory', 'Brand', 'availability', 'Price']],
                 use_container_width=True
             )
     
     with col2:
         # Inventory Value by Brand
         st.subheader("💰 Inventory Value by Brand")
-        brand_value = filtered_inventory.groupby('Brand')['Price'].sum().reset_index()
+        brand_value = inventory_index.value_by('Brand', brand=brand_filter).reset_index()
         brand_value.columns = ['Brand', 'Total_Value']
-        brand_value = brand_value.sort_values('Total_Value', ascending=False)
         
-        fig_brand = px.treemap(
+        fig_brand = treemap_figure(
             brand_value,
-            path=['Brand'],
+            path='Brand',
             values='Total_Value',
             title="Inventory Value Distribution by Brand"
         )
@@ -339,7 +384,7 @@ if not filtered_inventory.empty:
         
         # Top 10 Most Valuable Items
         st.subheader("💎 Top 10 Most Valuable Items")
-        top_items = filtered_inventory.nlargest(10, 'Price')[['nameInventory', 'Brand', 'Price', 'availability']]
+        top_items = inventory_index.top_n(10, brand=brand_filter)[['nameInventory', 'Brand', 'Price', 'availability']]
         st.dataframe(top_items, use_container_width=True)
 
 # --- Interactive Shipping Analytics --- #
@@ -353,7 +398,7 @@ if not df_shipping.empty:
         carrier_counts = df_shipping['carrier'].value_counts().reset_index()
         carrier_counts.columns = ['Carrier', 'Shipments']
         
-        fig_carrier = px.pie(
+        fig_carrier = pie_figure(
             carrier_counts,
             values='Shipments',
             names='Carrier',
@@ -367,15 +412,14 @@ if not df_shipping.empty:
         performance_data.columns = ['Carrier', 'Total_Shipments', 'Delayed_Shipments']
         performance_data['On_Time_Rate'] = ((performance_data['Total_Shipments'] - performance_data['Delayed_Shipments']) / performance_data['Total_Shipments'] * 100).round(2)
         
-        fig_performance = px.bar(
+        fig_performance = bar_figure(
             performance_data,
             x='Carrier',
             y='On_Time_Rate',
             title="On-Time Delivery Rate by Carrier (%)",
-            color='On_Time_Rate',
-            color_continuous_scale='RdYlGn'
+            colorscale='RdYlGn',
+            y_title="On-Time Rate (%)"
         )
-        fig_performance.update_layout(yaxis_title="On-Time Rate (%)")
         st.plotly_chart(fig_performance, use_container_width=True)
 
 # --- Data Export and Download --- #
@@ -384,7 +428,44 @@ st.header("📥 Export Data")
 col1, col2, col3 = st.columns(3)
 
 with col1:
-    if not filtered_data.empty:
+    if chunked_mode and sales["num_transactions"] > 0:
+        # The filtered rows are written chunk by chunk to a file on the server, so memory stays
+        # bounded however large the export is. A browser download needs the whole file in memory,
+        # so it is only offered up to EXPORT_DOWNLOAD_LIMIT_MB.
+        if st.button("📊 Export Sales Data"):
+            os.makedirs(exports_dir, exist_ok=True)
+            remove_old_exports(exports_dir, EXPORT_RETENTION_HOURS)
+            # A unique file per export, since all sessions share the directory
+            export_name = f"sales_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            export_fd, export_path = tempfile.mkstemp(prefix=f"{export_name}_", suffix=".csv", dir=exports_dir)
+            with os.fdopen(export_fd, "w", newline="") as export_file:
+                num_rows = write_filtered_csv(
+                    iter_filtered_chunks(
+                        transactions_dataset_dir, df_customers, start_date, end_date,
+                        selected_channel, selected_city, selected_state
+                    ),
+                    export_file
+                )
+            export_size_mb = os.path.getsize(export_path) / 1024 ** 2
+            if export_size_mb <= EXPORT_DOWNLOAD_LIMIT_MB:
+                with open(export_path, "rb") as export_file:
+                    export_data = export_file.read()
+                # The download button keeps its own copy, so the server file isn't needed any more
+                os.remove(export_path)
+                st.success(f"Exported {num_rows} transactions ({export_size_mb:.1f} MB)")
+                st.download_button(
+                    label="📊 Download Sales Data",
+                    data=export_data,
+                    file_name=f"{export_name}.csv",
+                    mime="text/csv"
+                )
+            else:
+                st.success(f"Exported {num_rows} transactions ({export_size_mb:.1f} MB) to {os.path.abspath(export_path)}")
+                st.warning(
+                    f"Export is larger than {EXPORT_DOWNLOAD_LIMIT_MB} MB; copy it from the server path above "
+                    f"within {EXPORT_RETENTION_HOURS} hours, after which it is deleted."
+                )
+    elif not filtered_data.empty:
         csv_sales = filtered_data.to_csv(index=False)
         st.download_button(
             label="📊 Download Sales Data",
@@ -394,14 +475,16 @@ with col1:
         )
 
 with col2:
-    if not filtered_inventory.empty:
-        csv_inventory = filtered_inventory.to_csv(index=False)
-        st.download_button(
-            label="📦 Download Inventory Data",
-            data=csv_inventory,
-            file_name=f"inventory_data_{datetime.now().strftime('%Y%m%d')}.csv",
-            mime="text/csv"
-        )
+    # Inventory rows are only built from the index when an export is requested
+    if len(inventory_index) > 0 and inventory_index.count(brand=brand_filter) > 0:
+        if st.button("📦 Prepare Inventory Export"):
+            csv_inventory = inventory_index.items(brand=brand_filter, all_columns=True).to_csv(index=False)
+            st.download_button(
+                label="📦 Download Inventory Data",
+                data=csv_inventory,
+                file_name=f"inventory_data_{datetime.now().strftime('%Y%m%d')}.csv",
+                mime="text/csv"
+            )
 
 with col3:
     if not df_shipping.empty:
@@ -0,0 +1,188 @@
+import bisect
+import threading
+from collections import defaultdict
+import pandas as pd
+
+# --- Configuration --- #
+INDEX_COLUMNS = ["inventoryID", "nameInventory", "Brand", "type", "Price", "availability", "status"]
+GROUP_FIELDS = ["Brand", "type", "availability", "status"]
+
+# --- Inventory Index --- #
+# Keeps counts and value totals per (Brand, type, availability, status) group and
+# price-ordered lists for top-N, so inventory views cost a pass over the groups
+# (a few dozen) instead of a scan of the catalog.
+#
+# The dashboards share one index per inventory file (st.cache_resource), and both the
+# views and the inventory export read from it. Stock changes are applied to that shared
+# object with add/update/remove, e.g. from a stock sync job running in the server process:
+#     load_inventory_index(excel_file).update("INV0001", availability="Out of Stock")
+# and show up on every session's next rerun. All access goes through a lock, since
+# sessions run in separate threads.
+class InventoryIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._columns = list(INDEX_COLUMNS)         # all record columns, in catalog order
+        self._items = {}                            # inventoryID -> record (all columns)
+        self._seq = 0                               # insertion order, used to keep catalog order
+        self._counts = defaultdict(int)             # group -> number of items
+        self._values = defaultdict(float)           # group -> sum of Price
+        self._members = defaultdict(list)           # group -> sorted (seq, inventoryID), i.e. catalog order
+        self._by_price = []                         # sorted (-Price, seq, inventoryID)
+        self._by_brand_price = defaultdict(list)    # Brand -> sorted (-Price, seq, inventoryID)
+
+    @classmethod
+    def from_dataframe(cls, df):
+        index = cls()
+        if df.empty:
+            return index
+        # Full rows are kept so the export can be served from the index as well
+        index._columns = list(df.columns)
+        records = df.drop_duplicates("inventoryID", keep="last").to_dict("records")
+        for record in records:
+            index._add(record, keep_sorted=False)
+        # Sort once after a bulk load instead of inserting into the sorted lists row by row
+        index._by_price.sort()
+        for entries in index._by_brand_price.values():
+            entries.sort()
+        return index
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+    def __contains__(self, inventory_id):
+        with self._lock:
+            return inventory_id in self._items
+
+    def brands(self):
+        with self._lock:
+            return list(self._by_brand_price)
+
+    # --- Updates --- #
+    def add(self, record):
+        with self._lock:
+            if record["inventoryID"] in self._items:
+                self._remove(record["inventoryID"])
+            self._add({column: record.get(column) for column in self._columns})
+
+    def update(self, inventory_id, **changes):
+        # e.g. index.update("INV0001", availability="Out of Stock") when stock runs out
+        with self._lock:
+            record = dict(self._items[inventory_id])
+            record.update(changes)
+            self._remove(inventory_id)
+            self._add(record)
+
+    def remove(self, inventory_id):
+        with self._lock:
+            record = self._remove(inventory_id)
+        return {column: value for column, value in record.items() if column != "_seq"}
+
+    # --- Queries --- #
+    def count(self, brand=None, item_type=None, availability=None, status=None):
+        with self._lock:
+            groups = self._matching_groups(brand, item_type, availability, status)
+            return sum(self._counts[group] for group in groups)
+
+    def value(self, brand=None, item_type=None, availability=None, status=None):
+        with self._lock:
+            groups = self._matching_groups(brand, item_type, availability, status)
+            return sum(self._values[group] for group in groups)
+
+    def count_by(self, field, brand=None, item_type=None, availability=None, status=None):
+        position = GROUP_FIELDS.index(field)
+        totals = defaultdict(int)
+        with self._lock:
+            for group in self._matching_groups(brand, item_type, availability, status):
+                totals[group[position]] += self._counts[group]
+        return pd.Series(totals, dtype="int64").sort_values(ascending=False)
+
+    def value_by(self, field, brand=None, item_type=None, availability=None, status=None):
+        position = GROUP_FIELDS.index(field)
+        totals = defaultdict(float)
+        with self._lock:
+            for group in self._matching_groups(brand, item_type, availability, status):
+                totals[group[position]] += self._values[group]
+        return pd.Series(totals, dtype="float64").sort_values(ascending=False)
+
+    def top_n(self, n, brand=None):
+        with self._lock:
+            entries = self._by_price if brand is None else self._by_brand_price.get(brand, [])
+            return self._to_frame(inventory_id for _, _, inventory_id in entries[:n])
+
+    def items(self, brand=None, item_type=None, availability=None, status=None, limit=None, all_columns=False):
+        # Matching items in catalog order; each group is kept sorted by catalog order,
+        # so only the first `limit` items of every matching group are looked at.
+        # all_columns=True returns the full inventory rows, as used by the export.
+        members = []
+        with self._lock:
+            for group in self._matching_groups(brand, item_type, availability, status):
+                members.extend(self._members[group][:limit])
+            members.sort()
+            return self._to_frame((inventory_id for _, inventory_id in members[:limit]), all_columns=all_columns)
+
+    # --- Internals --- #
+    # Callers hold self._lock
+    def _remove(self, inventory_id):
+        record = self._items.pop(inventory_id)
+        group = self._group(record)
+        self._counts[group] -= 1
+        self._values[group] -= record["Price"]
+        self._remove_sorted(self._members[group], (record["_seq"], inventory_id))
+        if self._counts[group] == 0:
+            del self._counts[group], self._values[group], self._members[group]
+        entry = (-record["Price"], record["_seq"], inventory_id)
+        self._remove_sorted(self._by_price, entry)
+        self._remove_sorted(self._by_brand_price[record["Brand"]], entry)
+        if not self._by_brand_price[record["Brand"]]:
+            del self._by_brand_price[record["Brand"]]
+        return record
+
+    def _add(self, record, keep_sorted=True):
+        if "_seq" in record:
+            # Updated items keep their place in catalog order
+            record = dict(record)
+        else:
+            record = dict(record, _seq=self._seq)
+            self._seq += 1
+        record["Price"] = float(record["Price"]) if pd.notna(record["Price"]) else 0.0
+        inventory_id = record["inventoryID"]
+        group = self._group(record)
+        self._items[inventory_id] = record
+        self._counts[group] += 1
+        self._values[group] += record["Price"]
+        entry = (-record["Price"], record["_seq"], inventory_id)
+        if keep_sorted:
+            # Updated items go back to their catalog position, not the end of the group
+            bisect.insort(self._members[group], (record["_seq"], inventory_id))
+            bisect.insort(self._by_price, entry)
+            bisect.insort(self._by_brand_price[record["Brand"]], entry)
+        else:
+            self._members[group].append((record["_seq"], inventory_id))
+            self._by_price.append(entry)
+            self._by_brand_price[record["Brand"]].append(entry)
+
+    @staticmethod
+    def _group(record):
+        return tuple(record[field] for field in GROUP_FIELDS)
+
+    @staticmethod
+    def _remove_sorted(entries, entry):
+        position = bisect.bisect_left(entries, entry)
+        if position < len(entries) and entries[position] == entry:
+            del entries[position]
+
+    def _matching_groups(self, brand, item_type, availability, status):
+        # Each filter is None (any), a single value, or a list of accepted values
+        wanted = (brand, item_type, availability, status)
+        return [
+            group for group in self._counts
+            if all(
+                value is None or (group[i] in value if isinstance(value, (list, tuple, set)) else group[i] == value)
+                for i, value in enumerate(wanted)
+            )
+        ]
+
+    def _to_frame(self, inventory_ids, all_columns=False):
+        rows = [self._items[inventory_id] for inventory_id in inventory_ids]
+        return pd.DataFrame(rows, columns=self._columns if all_columns else INDEX_COLUMNS)
@@ -0,0 +1,271 @@
+import os
+import time
+import random
+import shutil
+import resource
+import tempfile
+import threading
+import statistics
+import multiprocessing
+from queue import Empty
+from datetime import date, timedelta
+import pandas as pd
+from generate_dummy_data import (
+    generate_customers_data,
+    generate_vendors_data,
+    generate_inventory_data,
+    generate_transactions_data,
+    generate_shipping_data,
+)
+from transaction_store import preprocess_transactions, write_transactions_dataset
+
+try:
+    import psutil
+except ImportError:  # psutil is optional; peak RSS falls back to resource.getrusage
+    psutil = None
+
+# --- Configuration --- #
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DASHBOARD_SCRIPT = os.path.join(BASE_DIR, "interactive_dashboard.py")
+DEFAULT_SESSION_COUNTS = [1, 2, 4, 8, 16]
+SAMPLE_INTERVAL = 0.1
+
+# Sidebar widgets of interactive_dashboard.py, by label
+TIME_PERIOD = "Select Time Period:"
+CHANNEL = "📱 Sales Channel:"
+CITY = "🏙️ City:"
+STATE = "🗺️ State:"
+BRAND = "🏷️ Brand:"
+
+# --- Dataset --- #
+def generate_dataset(data_dir, num_transactions, num_customers=100, num_inventory=200, partitioned=False):
+    # Writes the same layout generate_dummy_data.py produces, at the requested size
+    dummy_data_dir = os.path.join(data_dir, "dummy_data")
+    os.makedirs(dummy_data_dir, exist_ok=True)
+
+    df_customers = generate_customers_data(num_customers)
+    df_inventory = generate_inventory_data(num_inventory)
+    customer_ids = df_customers["customerID"].tolist()
+    inventory_ids = df_inventory["inventoryID"].tolist()
+    df_transactions = generate_transactions_data(num_transactions, customer_ids=customer_ids, inventory_ids=inventory_ids)
+
+    with pd.ExcelWriter(os.path.join(dummy_data_dir, "ecommerce_data.xlsx"), engine='openpyxl') as writer:
+        df_customers.to_excel(writer, sheet_name='customers', index=False)
+        generate_vendors_data().to_excel(writer, sheet_name='vendors', index=False)
+        df_inventory.to_excel(writer, sheet_name='inventory', index=False)
+        df_transactions.to_excel(writer, sheet_name='transaction', index=False)
+        generate_shipping_data(num_transactions, customer_ids=customer_ids).to_excel(writer, sheet_name='shipping', index=False)
+
+    if partitioned:
+        write_transactions_dataset(
+            preprocess_transactions(df_transactions.copy()),
+            os.path.join(dummy_data_dir, "transactions"),
+            overwrite=True
+        )
+    return dummy_data_dir
+
+# --- Simulated Sessions --- #
+def random_filter_step(at, rng):
+    # One sidebar interaction, weighted towards what executives change most often
+    selectboxes = {selectbox.label: selectbox for selectbox in at.sidebar.selectbox}
+    label = rng.choices([TIME_PERIOD, CHANNEL, CITY, STATE, BRAND], weights=[4, 3, 1, 1, 2])[0]
+    if label not in selectboxes:
+        label = TIME_PERIOD
+    selectbox = selectboxes[label]
+    if label == TIME_PERIOD and selectbox.value == "Custom Range" and len(at.sidebar.date_input) == 2 and rng.random() < 0.5:
+        # The date inputs only exist after a rerun with "Custom Range" selected
+        end = date.today() - timedelta(days=rng.randint(0, 180))
+        start = end - timedelta(days=rng.choice([7, 30, 90, 365]))
+        at.sidebar.date_input[0].set_value(start)
+        at.sidebar.date_input[1].set_value(end)
+        return f"Custom Range {start} to {end}"
+    option = rng.choice(selectbox.options)
+    selectbox.select(option)
+    return f"{label} {option}"
+
+def run_session(session_id, data_dir, num_steps, think_time, timeout, seed, barrier):
+    # AppTest swaps the process-global Streamlit runtime in and out around every run, so two
+    # AppTests can't run at once in one process: each session gets a process of its own
+    from streamlit.testing.v1 import AppTest
+
+    os.chdir(data_dir)
+    rng = random.Random(seed + session_id)
+    latencies, errors, failed = [], [], 0
+    at = AppTest.from_file(DASHBOARD_SCRIPT, default_timeout=timeout)
+    try:
+        # Start the first reruns together once every session process has imported Streamlit
+        barrier.wait(timeout=timeout)
+    except threading.BrokenBarrierError:
+        pass
+    for step in range(num_steps + 1):
+        action = "initial load"
+        try:
+            if step > 0:
+                action = random_filter_step(at, rng)
+            start = time.perf_counter()
+            at.run()
+        except Exception as e:
+            # The remaining reruns of this session are counted as missing by run_level
+            errors.append(f"session {session_id}, {action}: {e}")
+            break
+        latencies.append(time.perf_counter() - start)
+        if at.exception:
+            failed += 1
+            errors.append(f"session {session_id}, {action}: {at.exception[0].value}")
+        if think_time:
+            time.sleep(rng.uniform(0, 2 * think_time))
+    return {"session": session_id, "latencies": latencies, "errors": errors, "failed": failed}
+
+def _run_session_worker(queue, *args):
+    queue.put(run_session(*args))
+
+def sample_resources(stop, samples):
+    # Total RSS of the session processes
+    process = psutil.Process() if psutil else None
+    while not stop.is_set():
+        if process:
+            samples.append(sum(child.memory_info().rss for child in process.children(recursive=True)))
+        stop.wait(SAMPLE_INTERVAL)
+
+def collect_results(queue, processes):
+    # Waits for a result from every session, giving up on sessions whose process has died
+    results = []
+    while len(results) < len(processes):
+        try:
+            results.append(queue.get(timeout=1))
+        except Empty:
+            if any(process.is_alive() for process in processes):
+                continue
+            # Every worker exited: take one last look in case a result arrived just before
+            try:
+                results.append(queue.get(timeout=1))
+            except Empty:
+                break
+    for process in processes:
+        process.join()
+    return results
+
+def run_level(num_sessions, data_dir, num_steps, think_time, timeout, seed):
+    # One process per session, started fresh for every level, so memory doesn't carry over
+    # from the previous level. Sessions don't share st.cache_* caches as they would inside
+    # one Streamlit server, so cold-cache reruns are measured once per session.
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    barrier = context.Barrier(num_sessions)
+    processes = [
+        context.Process(
+            target=_run_session_worker,
+            args=(queue, session_id, data_dir, num_steps, think_time, timeout, seed, barrier)
+        )
+        for session_id in range(num_sessions)
+    ]
+    rss_samples = []
+    stop = threading.Event()
+    sampler = threading.Thread(target=sample_resources, args=(stop, rss_samples), daemon=True)
+
+    cpu_start = os.times()
+    wall_start = time.perf_counter()
+    sampler.start()
+    for process in processes:
+        process.start()
+    results = collect_results(queue, processes)
+    stop.set()
+    sampler.join()
+    wall = time.perf_counter() - wall_start
+    cpu_end = os.times()
+    # Session processes have all been joined, so their CPU time shows up in the children_* fields
+    cpu = (cpu_end.children_user - cpu_start.children_user) + (cpu_end.children_system - cpu_start.children_system)
+
+    latencies, errors, failed = [], [], 0
+    reported = {result["session"]: result for result in results}
+    for session_id, process in enumerate(processes):
+        if session_id not in reported:
+            errors.append(f"session {session_id}: process exited with code {process.exitcode} before reporting results")
+            continue
+        latencies.extend(reported[session_id]["latencies"])
+        errors.extend(reported[session_id]["errors"])
+        failed += reported[session_id]["failed"]
+    # Every rerun that didn't complete counts as failed too, whatever stopped it
+    failed += num_sessions * (num_steps + 1) - len(latencies)
+
+    if rss_samples:
+        peak_rss = max(rss_samples)
+    else:
+        # ru_maxrss is in kilobytes on Linux, and only covers the largest session process
+        peak_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * 1024
+    return {
+        "sessions": num_sessions,
+        "reruns": len(latencies),
+        "failed_reruns": failed,
+        "errors": errors,
+        "latencies": latencies,
+        "wall_seconds": wall,
+        "cpu_percent": cpu / wall * 100 if wall > 0 else 0,
+        "peak_rss_mb": peak_rss / 1024 ** 2,
+    }
+
+# --- Reporting --- #
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[pct - 1]
+
+def summarize(result):
+    latencies_ms = [latency * 1000 for latency in result["latencies"]]
+    return {
+        "sessions": result["sessions"],
+        "reruns": result["reruns"],
+        "errors": result["failed_reruns"],
+        "p50_ms": round(percentile(latencies_ms, 50), 1),
+        "p95_ms": round(percentile(latencies_ms, 95), 1),
+        "p99_ms": round(percentile(latencies_ms, 99), 1),
+        "reruns_per_s": round(result["reruns"] / result["wall_seconds"], 2) if result["wall_seconds"] > 0 else 0,
+        "cpu_percent": round(result["cpu_percent"], 1),
+        "peak_rss_mb": round(result["peak_rss_mb"], 1),
+    }
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Simulate concurrent sessions of interactive_dashboard.py and report rerun latency.")
+    parser.add_argument("--sessions", type=int, nargs="+", default=DEFAULT_SESSION_COUNTS, help="Concurrent session counts to test")
+    parser.add_argument("--steps", type=int, default=10, help="Sidebar filter changes per session")
+    parser.add_argument("--transactions", type=int, default=5000, help="Transactions in the generated dataset")
+    parser.add_argument("--partitioned", action="store_true", help="Also write the month-partitioned dataset (chunked mode)")
+    parser.add_argument("--data-dir", help="Existing directory containing dummy_data/ (skips generation)")
+    parser.add_argument("--keep-data", action="store_true", help="Keep the generated dataset instead of deleting it afterwards")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean pause between filter changes, in seconds")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Timeout for a single rerun, in seconds")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the filter sequences")
+    parser.add_argument("--csv", help="Also write the summary table to this CSV file")
+    args = parser.parse_args()
+
+    if args.data_dir:
+        data_dir = os.path.abspath(args.data_dir)
+    else:
+        data_dir = tempfile.mkdtemp(prefix="dashboard_load_test_")
+        print(f"Generating {args.transactions} transactions in {data_dir}...")
+        random.seed(args.seed)
+        generate_dataset(data_dir, args.transactions, partitioned=args.partitioned)
+
+    rows = []
+    try:
+        for num_sessions in args.sessions:
+            print(f"Running {num_sessions} concurrent session(s)...")
+            result = run_level(num_sessions, data_dir, args.steps, args.think_time, args.timeout, args.seed)
+            for error in result["errors"][:5]:
+                print(f"  error: {error}")
+            rows.append(summarize(result))
+    finally:
+        if not args.data_dir:
+            if args.keep_data:
+                print(f"Generated dataset kept in {data_dir}")
+            else:
+                shutil.rmtree(data_dir, ignore_errors=True)
+
+    summary = pd.DataFrame(rows)
+    print(summary.to_string(index=False))
+    if args.csv:
+        summary.to_csv(args.csv, index=False)
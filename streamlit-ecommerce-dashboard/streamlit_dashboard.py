@@ -2,6 +2,15 @@ import streamlit as st
 import pandas as pd
 import os
 from datetime import datetime, timedelta
+from transaction_store import (
+    preprocess_transactions,
+    filter_transactions,
+    aggregate_transactions,
+    aggregate_transactions_chunked,
+    has_dataset,
+    dataset_version,
+)
+from inventory_index import InventoryIndex
 
 # --- Configuration --- #
 st.set_page_config(
@@ -38,9 +47,25 @@ def load_data_from_excel(local_path, github_url=None):
         st.error(f"Error loading file '{local_path}': {e}")
         return pd.DataFrame()
 
+@st.cache_resource
+def load_inventory_index(local_path, github_url=None):
+    # Built once per file and shared by all sessions; the inventory section queries it instead of df_inventory
+    df = load_data_from_excel(local_path, github_url)
+    if not df.empty:
+        df["Price"] = pd.to_numeric(df["Price"], errors='coerce').fillna(0)
+    return InventoryIndex.from_dataframe(df)
+
+@st.cache_data(max_entries=256, ttl=3600)
+def load_sales_aggregates_chunked(dataset_dir, start_date, end_date, version):
+    # version (see dataset_version) is only part of the cache key, so newly ingested parts aren't served stale
+    return aggregate_transactions_chunked(dataset_dir, pd.DataFrame(), start_date, end_date)
+
 # --- Base directory (lokal) ---
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 dummy_data_dir = os.path.join(BASE_DIR, "dummy_data")
+# Large transaction histories are read chunk by chunk from a Parquet dataset (see transaction_store.py)
+transactions_dataset_dir = os.path.join(dummy_data_dir, "transactions")
+chunked_mode = has_dataset(transactions_dataset_dir)
 
 # --- GitHub raw base URL ---
 # Ganti USERNAME & REPO sesuai punyamu
@@ -62,7 +87,12 @@ df_inventory = load_data_from_excel(
     f"{github_base_url}/inventory.xlsx"
 )
 
-df_transactions = load_data_from_excel(
+inventory_index = load_inventory_index(
+    os.path.join(dummy_data_dir, "inventory.xlsx"),
+    f"{github_base_url}/inventory.xlsx"
+)
+
+df_transactions = pd.DataFrame() if chunked_mode else load_data_from_excel(
     os.path.join(dummy_data_dir, "transaction.xlsx"),
     f"{github_base_url}/transaction.xlsx"
 )
@@ -76,10 +106,7 @@ df_shipping = load_data_from_excel(
 
 # --- Data Preprocessing (if DataFrames are not empty) --- #
 if not df_transactions.empty:
-    df_transactions["totalSales"] = pd.to_numeric(df_transactions["totalSales"], errors='coerce').fillna(0)
-    df_transactions["totalEarings"] = pd.to_numeric(df_transactions["totalEarings"], errors='coerce').fillna(0)
-    # Create a simple transaction date based on row index (for demo purposes)
-    df_transactions["transactionDate"] = pd.date_range(start='2024-01-01', periods=len(df_transactions), freq='D')
+    df_transactions = preprocess_transactions(df_transactions)
 
 if not df_inventory.empty:
     df_inventory["Price"] = pd.to_numeric(df_inventory["Price"], errors='coerce').fillna(0)
@@ -112,16 +139,23 @@ else:  # Custom Range
     with col2:
         end_date = st.date_input("End Date", datetime.now())
 
+# Filters work on whole days. Plain dates (rather than datetime.now()) also keep the
+# cached aggregates below keyed per day, so reruns on the same day hit the cache.
+start_date = pd.Timestamp(start_date).date()
+end_date = pd.Timestamp(end_date).date()
+
 st.info(f"Showing data from {start_date.strftime('%Y-%m-%d') if hasattr(start_date, 'strftime') else start_date} to {end_date.strftime('%Y-%m-%d') if hasattr(end_date, 'strftime') else end_date}")
 
 # Filter transactions by date
-if not df_transactions.empty:
-    filtered_transactions = df_transactions[
-        (df_transactions["transactionDate"] >= pd.to_datetime(start_date))
-        & (df_transactions["transactionDate"] <= pd.to_datetime(end_date))
-    ]
+if chunked_mode:
+    sales = load_sales_aggregates_chunked(
+        transactions_dataset_dir, start_date, end_date,
+        dataset_version(transactions_dataset_dir, start_date, end_date)
+    )
+elif not df_transactions.empty:
+    sales = aggregate_transactions(filter_transactions(df_transactions, start_date, end_date))
 else:
-    filtered_transactions = pd.DataFrame()
+    sales = aggregate_transactions(pd.DataFrame())
 
 # --- KPI Section --- #
 st.header("Key Performance Indicators")
@@ -130,12 +164,12 @@ kpi_col1, kpi_col2, kpi_col3, kpi_col4 = st.columns(4)
 
 # Total Sales
 with kpi_col1:
-    total_sales = filtered_transactions["totalSales"].sum() if not filtered_transactions.empty else 0
+    total_sales = sales["total_sales"]
     st.metric(label="Total Sales", value=f"${total_sales:,.2f}")
 
 # Total Earnings
 with kpi_col2:
-    total_earnings = filtered_transactions["totalEarings"].sum() if not filtered_transactions.empty else 0
+    total_earnings = sales["total_earnings"]
     st.metric(label="Total Earnings", value=f"${total_earnings:,.2f}")
 
 # Number of Customers
@@ -151,15 +185,15 @@ with kpi_col4:
 # --- Sales Performance Section --- #
 st.header("Sales Performance")
 
-if not filtered_transactions.empty:
+if sales["num_transactions"] > 0:
     # Sales by Channel
     st.subheader("Sales by Channel")
-    sales_by_channel = filtered_transactions.groupby("notes")["totalSales"].sum().sort_values(ascending=False)
+    sales_by_channel = sales["channel_sales"].set_index("Channel")["Sales"].sort_values(ascending=False)
     st.bar_chart(sales_by_channel)
 
     # Sales Trends (Daily)
     st.subheader("Daily Sales Trend")
-    daily_sales = filtered_transactions.groupby(filtered_transactions["transactionDate"].dt.date)["totalSales"].sum()
+    daily_sales = sales["daily_sales"].set_index("Date")["Sales"]
     st.line_chart(daily_sales)
 else:
     st.info("No sales data available for the selected date range.")
@@ -167,14 +201,14 @@ else:
 # --- Inventory Management Section --- #
 st.header("Inventory Management")
 
-if not df_inventory.empty:
+if len(inventory_index) > 0:
     # Total Inventory Value
-    total_inventory_value = df_inventory[df_inventory["availability"] == "In Stock"]["Price"].sum()
+    total_inventory_value = inventory_index.value(availability="In Stock")
     st.metric(label="Total Inventory Value (In Stock)", value=f"${total_inventory_value:,.2f}")
 
     # Low Stock / Out of Stock Items
-    low_stock_items = df_inventory[df_inventory["availability"] == "Low Stock"]
-    out_of_stock_items = df_inventory[df_inventory["availability"] == "Out of Stock"]
+    low_stock_items = inventory_index.items(availability="Low Stock")
+    out_of_stock_items = inventory_index.items(availability="Out of Stock")
 
     st.subheader("Inventory Status")
     col_inv1, col_inv2 = st.columns(2)
@@ -189,7 +223,7 @@ if not df_inventory.empty:
 
     # Inventory by Type
     st.subheader("Inventory by Type")
-    inventory_by_type = df_inventory.groupby("type")["inventoryID"].count().sort_values(ascending=False)
+    inventory_by_type = inventory_index.count_by("type")
     st.bar_chart(inventory_by_type)
 
 else:
@@ -234,7 +268,10 @@ with st.expander("View Vendors Data"):
 with st.expander("View Inventory Data"):
     st.dataframe(df_inventory)
 with st.expander("View Transactions Data"):
-    st.dataframe(df_transactions)
+    if chunked_mode:
+        st.info(f"Transactions are read in chunks from {transactions_dataset_dir} and are not loaded here.")
+    else:
+        st.dataframe(df_transactions)
 with st.expander("View Shipping Data"):
     st.dataframe(df_shipping)
 
@@ -0,0 +1,54 @@
+import random
+import pandas as pd
+import pytest
+from inventory_index import InventoryIndex, INDEX_COLUMNS
+from generate_dummy_data import generate_inventory_data
+
+AVAILABILITY = ["In Stock", "Low Stock", "Out of Stock"]
+
+def small_inventory():
+    return pd.DataFrame({
+        "inventoryID": ["I1", "I2", "I3", "I4", "I5"],
+        "nameInventory": ["A", "B", "C", "D", "E"],
+        "Brand": ["X", "X", "Y", "Y", "X"],
+        "type": ["t", "t", "t", "t", "t"],
+        "Price": [10.0, 20.0, 30.0, 40.0, 50.0],
+        "availability": ["Low Stock", "Low Stock", "In Stock", "In Stock", "In Stock"],
+        "status": ["Active"] * 5,
+    })
+
+def test_update_keeps_catalog_order():
+    index = InventoryIndex.from_dataframe(small_inventory())
+    index.update("I1", availability="In Stock")
+    index.update("I1", availability="Low Stock")
+    assert index.items(availability="Low Stock", limit=1)["inventoryID"].tolist() == ["I1"]
+    assert index.items(availability="Low Stock")["inventoryID"].tolist() == ["I1", "I2"]
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_matches_pandas_after_updates(seed):
+    random.seed(seed)
+    rng = random.Random(seed)
+    df = generate_inventory_data(2000)
+    index = InventoryIndex.from_dataframe(df)
+    df = df.set_index("inventoryID", drop=False)
+
+    for _ in range(500):
+        inventory_id = rng.choice(df.index.tolist())
+        changes = {"availability": rng.choice(AVAILABILITY)}
+        if rng.random() < 0.3:
+            changes["Price"] = round(rng.uniform(10, 2000), 2)
+        index.update(inventory_id, **changes)
+        for column, value in changes.items():
+            df.loc[inventory_id, column] = value
+    df = df.reset_index(drop=True)
+
+    critical = ["Low Stock", "Out of Stock"]
+    for brand in [None, df["Brand"].iloc[0]]:
+        subset = df if brand is None else df[df["Brand"] == brand]
+        mask = subset["availability"].isin(critical)
+        expected = subset[mask].head(10)[INDEX_COLUMNS].reset_index(drop=True)
+        pd.testing.assert_frame_equal(index.items(brand=brand, availability=critical, limit=10), expected, check_dtype=False)
+        assert index.count(brand=brand, availability=critical) == int(mask.sum())
+        assert index.value(brand=brand) == pytest.approx(subset["Price"].sum())
+        expected_top = subset.sort_values("Price", ascending=False, kind="stable").head(10)["inventoryID"].tolist()
+        assert index.top_n(10, brand=brand)["inventoryID"].tolist() == expected_top
@@ -0,0 +1,283 @@
+import os
+import glob
+import shutil
+from urllib.parse import quote, unquote
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# --- Configuration --- #
+DEFAULT_BATCH_SIZE = 100_000
+DEFAULT_ROWS_PER_FILE = 500_000
+DATE_RANGE_START = '2024-01-01'
+# Transactions without a channel are labelled with this, so they get a real partition and filter option
+UNKNOWN_CHANNEL = 'Unknown'
+DAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+TIME_BUCKET_COLUMNS = ["day_bucket", "week_bucket", "month_bucket", "day_of_week"]
+
+# --- Time Buckets --- #
+# Integer codes derived from transactionDate with plain arithmetic, no string formatting:
+#   day_bucket   days since 1970-01-01
+#   week_bucket  weeks since the Monday before 1970-01-01 (1970-01-01 was a Thursday)
+#   month_bucket months since 1970-01
+#   day_of_week  0 = Monday ... 6 = Sunday
+def add_time_buckets(df):
+    days = df["transactionDate"].values.astype('datetime64[D]').astype('int64')
+    months = df["transactionDate"].values.astype('datetime64[M]').astype('int64')
+    df["day_bucket"] = days.astype('int32')
+    df["week_bucket"] = ((days + 3) // 7).astype('int32')
+    df["month_bucket"] = months.astype('int32')
+    df["day_of_week"] = ((days + 3) % 7).astype('int8')
+    return df
+
+def month_bucket(date):
+    return int(np.datetime64(pd.Timestamp(date).to_datetime64(), 'M').astype('int64'))
+
+def month_label(bucket):
+    return str(np.datetime64(int(bucket), 'M'))
+
+# --- Preprocessing shared by the in-memory and chunked paths --- #
+def preprocess_transactions(df, start_index=0):
+    df["totalSales"] = pd.to_numeric(df["totalSales"], errors='coerce').fillna(0)
+    df["totalEarings"] = pd.to_numeric(df["totalEarings"], errors='coerce').fillna(0)
+    df["notes"] = df["notes"].fillna(UNKNOWN_CHANNEL)
+    if "transactionDate" in df.columns:
+        df["transactionDate"] = pd.to_datetime(df["transactionDate"], errors='coerce')
+        if df["transactionDate"].isna().any():
+            df = df[df["transactionDate"].notna()].copy()
+    else:
+        # Older exports carry no timestamp: fall back to one transaction per day by row index.
+        # start_index keeps the dates continuous when the table is processed in chunks.
+        df["transactionDate"] = pd.date_range(
+            start=pd.Timestamp(DATE_RANGE_START) + pd.Timedelta(days=start_index),
+            periods=len(df),
+            freq='D'
+        )
+    if not set(TIME_BUCKET_COLUMNS).issubset(df.columns):
+        df = add_time_buckets(df)
+    return df
+
+def date_bounds(start_date, end_date):
+    # end_date is a whole day: transactions are kept up to the start of the following day (exclusive)
+    start = pd.Timestamp(start_date) if start_date is not None else None
+    end = pd.Timestamp(end_date).normalize() + pd.Timedelta(days=1) if end_date is not None else None
+    return start, end
+
+def filter_transactions(df, start_date, end_date, channel='All', city='All', state='All'):
+    start, end = date_bounds(start_date, end_date)
+    mask = (df["transactionDate"] >= start) & (df["transactionDate"] < end)
+    if channel != 'All':
+        mask &= df['notes'] == channel
+    if city != 'All':
+        mask &= df['city'] == city
+    if state != 'All':
+        mask &= df['state'] == state
+    return df[mask]
+
+# --- Partial aggregates --- #
+# Every aggregate the dashboards show is a sum, a count or a set union, so the
+# result for the whole table is the merge of the results for each chunk.
+def partial_aggregates(df):
+    return {
+        "total_sales": df["totalSales"].sum(),
+        "total_earnings": df["totalEarings"].sum(),
+        "num_transactions": len(df),
+        "customers": set(df["customerID"].dropna().unique()),
+        "daily_sales": df.groupby("day_bucket")["totalSales"].sum(),
+        "channel_sales": df.groupby("notes")["totalSales"].sum(),
+        "state_sales": df.groupby("state")["totalSales"].sum() if "state" in df.columns else pd.Series(dtype=float),
+        "dow_sales": df.groupby("day_of_week")["totalSales"].sum(),
+    }
+
+def merge_aggregates(left, right):
+    if left is None:
+        return right
+    return {
+        "total_sales": left["total_sales"] + right["total_sales"],
+        "total_earnings": left["total_earnings"] + right["total_earnings"],
+        "num_transactions": left["num_transactions"] + right["num_transactions"],
+        "customers": left["customers"] | right["customers"],
+        "daily_sales": left["daily_sales"].add(right["daily_sales"], fill_value=0),
+        "channel_sales": left["channel_sales"].add(right["channel_sales"], fill_value=0),
+        "state_sales": left["state_sales"].add(right["state_sales"], fill_value=0),
+        "dow_sales": left["dow_sales"].add(right["dow_sales"], fill_value=0),
+    }
+
+def finalize_aggregates(agg):
+    if agg is None:
+        agg = partial_aggregates(pd.DataFrame({
+            "totalSales": pd.Series(dtype=float),
+            "totalEarings": pd.Series(dtype=float),
+            "customerID": pd.Series(dtype=object),
+            "day_bucket": pd.Series(dtype='int32'),
+            "notes": pd.Series(dtype=object),
+            "state": pd.Series(dtype=object),
+            "day_of_week": pd.Series(dtype='int8'),
+        }))
+
+    # Bucket codes are turned back into labels only for the handful of aggregated rows
+    daily_sales = agg["daily_sales"].sort_index().reset_index()
+    daily_sales.columns = ['Date', 'Sales']
+    daily_sales['Date'] = pd.to_datetime(daily_sales['Date'].astype('int64'), unit='D').dt.date
+
+    channel_sales = agg["channel_sales"].sort_index().reset_index()
+    channel_sales.columns = ['Channel', 'Sales']
+
+    geo_sales = agg["state_sales"].sort_index().reset_index()
+    geo_sales.columns = ['State', 'Sales']
+    geo_sales = geo_sales.sort_values('Sales', ascending=False)
+
+    dow_sales = agg["dow_sales"].sort_index().reset_index()
+    dow_sales.columns = ['Day', 'Sales']
+    dow_sales['Day'] = pd.Categorical.from_codes(dow_sales['Day'].astype('int8'), categories=DAY_ORDER, ordered=True)
+
+    return {
+        "total_sales": agg["total_sales"],
+        "total_earnings": agg["total_earnings"],
+        "num_transactions": agg["num_transactions"],
+        "unique_customers": len(agg["customers"]),
+        "daily_sales": daily_sales,
+        "channel_sales": channel_sales,
+        "geo_sales": geo_sales,
+        "dow_sales": dow_sales,
+    }
+
+def aggregate_transactions(df):
+    return finalize_aggregates(partial_aggregates(df) if not df.empty else None)
+
+# --- Columnar storage --- #
+# Transactions are partitioned by month and then by channel:
+#   <dataset_dir>/month=2024-01/channel=Mobile%20App/part-00000.parquet
+# so a date window and a channel filter only open the partitions they overlap.
+def partition_path(dataset_dir, month, channel):
+    return os.path.join(dataset_dir, f"month={month}", f"channel={quote(str(channel), safe='')}")
+
+def list_partitions(dataset_dir, start_date=None, end_date=None, channel='All'):
+    start, end = date_bounds(start_date, end_date)
+    start_month = month_label(month_bucket(start)) if start is not None else None
+    # The end bound is exclusive, so the last month with data is the one just before it
+    end_month = month_label(month_bucket(end - pd.Timedelta(microseconds=1))) if end is not None else None
+    partitions = []
+    for month_dir in sorted(glob.glob(os.path.join(dataset_dir, "month=*"))):
+        month = os.path.basename(month_dir)[len("month="):]
+        # Months are zero-padded, so string order is date order
+        if start_month is not None and month < start_month:
+            continue
+        if end_month is not None and month > end_month:
+            continue
+        for channel_dir in sorted(glob.glob(os.path.join(month_dir, "channel=*"))):
+            partition_channel = unquote(os.path.basename(channel_dir)[len("channel="):])
+            if channel != 'All' and partition_channel != channel:
+                continue
+            partitions.append((month, partition_channel, channel_dir))
+    return partitions
+
+def list_dataset_files(dataset_dir, start_date=None, end_date=None, channel='All'):
+    files = []
+    for _, _, partition_dir in list_partitions(dataset_dir, start_date, end_date, channel):
+        files.extend(sorted(glob.glob(os.path.join(partition_dir, "*.parquet"))))
+    return files
+
+def dataset_version(dataset_dir, start_date=None, end_date=None, channel='All'):
+    # Changes whenever a part file inside the pruned partitions is added, removed or rewritten,
+    # so results cached on it are recomputed after an ingest
+    files = list_dataset_files(dataset_dir, start_date, end_date, channel)
+    return len(files), max((os.path.getmtime(path) for path in files), default=0.0)
+
+def list_channels(dataset_dir):
+    return sorted({channel for _, channel, _ in list_partitions(dataset_dir)})
+
+def has_dataset(dataset_dir):
+    return os.path.isdir(dataset_dir) and len(list_dataset_files(dataset_dir)) > 0
+
+def write_transactions_dataset(df, dataset_dir, rows_per_file=DEFAULT_ROWS_PER_FILE, overwrite=False):
+    if overwrite and os.path.isdir(dataset_dir):
+        shutil.rmtree(dataset_dir)
+    os.makedirs(dataset_dir, exist_ok=True)
+    if "month_bucket" not in df.columns:
+        df = add_time_buckets(df.copy())
+    if df["notes"].isna().any():
+        df = df.assign(notes=df["notes"].fillna(UNKNOWN_CHANNEL))
+    written = 0
+    for (month, channel), partition in df.groupby(["month_bucket", "notes"], sort=True):
+        partition_dir = partition_path(dataset_dir, month_label(month), channel)
+        os.makedirs(partition_dir, exist_ok=True)
+        # New parts are appended next to existing ones, so repeated ingests add to a partition
+        part = len(glob.glob(os.path.join(partition_dir, "*.parquet")))
+        for start in range(0, len(partition), rows_per_file):
+            table = pa.Table.from_pandas(partition.iloc[start:start + rows_per_file], preserve_index=False)
+            pq.write_table(table, os.path.join(partition_dir, f"part-{part:05d}.parquet"))
+            part += 1
+        written += len(partition)
+    return written
+
+def iter_transaction_chunks(dataset_dir, columns=None, batch_size=DEFAULT_BATCH_SIZE,
+                            start_date=None, end_date=None, channel='All'):
+    for path in list_dataset_files(dataset_dir, start_date, end_date, channel):
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+            yield batch.to_pandas()
+
+def iter_filtered_chunks(dataset_dir, df_customers, start_date, end_date, channel='All', city='All', state='All',
+                         columns=None, batch_size=DEFAULT_BATCH_SIZE):
+    chunks = iter_transaction_chunks(
+        dataset_dir, columns=columns, batch_size=batch_size,
+        start_date=start_date, end_date=end_date, channel=channel
+    )
+    for chunk in chunks:
+        if not df_customers.empty:
+            chunk = chunk.merge(df_customers[['customerID', 'city', 'state']], on='customerID', how='left')
+        filtered = filter_transactions(chunk, start_date, end_date, channel, city, state)
+        if not filtered.empty:
+            yield filtered
+
+def aggregate_transactions_chunked(dataset_dir, df_customers, start_date, end_date, channel='All', city='All', state='All',
+                                   batch_size=DEFAULT_BATCH_SIZE):
+    agg = None
+    for chunk in iter_filtered_chunks(dataset_dir, df_customers, start_date, end_date, channel, city, state,
+                                      batch_size=batch_size):
+        agg = merge_aggregates(agg, partial_aggregates(chunk))
+    return finalize_aggregates(agg)
+
+def write_filtered_csv(chunks, out):
+    # Streams the export chunk by chunk so the filtered table is never held in memory at once
+    header = True
+    rows = 0
+    for chunk in chunks:
+        chunk.to_csv(out, index=False, header=header)
+        header = False
+        rows += len(chunk)
+    return rows
+
+# --- Ingest --- #
+def ingest_transactions(source_path, dataset_dir, chunksize=DEFAULT_BATCH_SIZE, sheet_name="transaction", overwrite=False):
+    if overwrite and os.path.isdir(dataset_dir):
+        shutil.rmtree(dataset_dir)
+    # offset counts source rows (for the fallback dates); written counts rows that survived preprocessing
+    offset = 0
+    written = 0
+    if source_path.endswith(".csv"):
+        for chunk in pd.read_csv(source_path, chunksize=chunksize):
+            written += write_transactions_dataset(preprocess_transactions(chunk, start_index=offset), dataset_dir)
+            offset += len(chunk)
+    else:
+        df = pd.read_excel(source_path, sheet_name=sheet_name)
+        written = write_transactions_dataset(preprocess_transactions(df), dataset_dir)
+    return written
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert transaction history to a month-partitioned Parquet dataset.")
+    parser.add_argument("source", nargs="?", default="./dummy_data/ecommerce_data.xlsx",
+                        help="Transaction history as .csv or an Excel workbook with a 'transaction' sheet")
+    parser.add_argument("--output", default="./dummy_data/transactions", help="Dataset directory to write to")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_BATCH_SIZE, help="Rows read per CSV chunk")
+    parser.add_argument("--overwrite", action="store_true", help="Replace the dataset instead of appending to it")
+    args = parser.parse_args()
+
+    print(f"Ingesting {args.source}...")
+    num_rows = ingest_transactions(args.source, args.output, chunksize=args.chunksize, overwrite=args.overwrite)
+    print(f"Wrote {num_rows} transactions to {args.output}")